@@ -4,21 +4,105 @@ Comprehensive Backend API Testing for Fractal Module
 Tests all endpoints related to the fractal overlay functionality
 """
 
-import requests
-import json
+import asyncio
+import functools
+import httpx
+import orjson
 import sys
 import time
 from datetime import datetime
 
+def api_test(name, path, params=None, timeout=None):
+    """Turn a validator `(self, response, data) -> (passed, details)` into a logged GET test.
+
+    The wrapper issues the request through `FractalBackendTester.get` and routes status checks,
+    JSON parsing and exceptions through `FractalBackendTester.evaluate`.
+    """
+    request_kwargs = {'params': params}
+    if timeout is not None:
+        request_kwargs['timeout'] = timeout
+    
+    def decorator(validate):
+        @functools.wraps(validate)
+        async def wrapper(self):
+            try:
+                response = await self.get(path, **request_kwargs)
+            except Exception as e:
+                response = e
+            passed, details = self.evaluate(
+                response, lambda r, data: validate(self, r, data)
+            )
+            self.log_test(name, passed, details)
+            return passed
+        return wrapper
+    return decorator
+
 class FractalBackendTester:
+    HEALTH_PATH = "/api/health"
+    OVERLAY_PATH = "/api/fractal/v2.1/overlay"
+    STRATEGY_PATH = "/api/fractal/v2.1/strategy"
+    FORWARD_EQUITY_PATH = "/api/fractal/v2.1/admin/forward-equity"
+    ADMIN_PATHS = ("/admin/fractal", "/api/admin/fractal")
+
+    # Any failure among these fails the run regardless of pass rate
+    CRITICAL_TESTS = frozenset({
+        'Strategy Endpoint (All Modes)',
+        'Forward Equity Endpoint (All Params)',
+        'Fractal Overlay Basic',
+    })
+
+    # (aftermathDays, minimum expected aftermath length)
+    HORIZONS = [(30, 20), (180, 150), (365, 300)]
+    STRATEGY_MODES = ('conservative', 'balanced', 'aggressive')
+    # Passed to httpx as-is, so each case doubles as its query params
+    FORWARD_EQUITY_CASES = [
+        {'symbol': 'BTC', 'preset': 'BALANCED', 'horizon': 7, 'role': 'ACTIVE'},
+        {'symbol': 'BTC', 'preset': 'CONSERVATIVE', 'horizon': 14, 'role': 'SHADOW'},
+        {'symbol': 'BTC', 'preset': 'AGGRESSIVE', 'horizon': 30, 'role': 'ACTIVE'}
+    ]
+
     def __init__(self, base_url="http://localhost:8002"):
         self.base_url = base_url
         self.tests_run = 0
         self.tests_passed = 0
         self.test_results = []
+        self.client = None  # set by __aenter__
+        self.critical_failure = False
+        # One wall-clock read per run; per-test times are monotonic offsets
+        self.started_at = datetime.now()
+        self._started_monotonic = time.monotonic()
+
+    async def __aenter__(self):
+        """Open the shared connection-pooled client for the whole run"""
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            # Fail fast on connect; slow endpoints still get 30s to respond
+            timeout=httpx.Timeout(30, connect=2.0),
+            limits=httpx.Limits(max_connections=32),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    async def get(self, path, retries=2, backoff=0.25, **kwargs):
+        """GET on the shared client, retrying only connection failures with backoff.
+
+        HTTP error statuses and read timeouts are returned/raised as-is, so the
+        worst case stays bounded at a few short connect attempts per request.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return await self.client.get(path, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt)
 
     def log_test(self, test_name, success, details=""):
-        """Log test result"""
+        """Log test result (sync, so concurrent tests never interleave output)"""
         self.tests_run += 1
         if success:
             self.tests_passed += 1
@@ -27,7 +111,7 @@ class FractalBackendTester:
             "test_name": test_name,
             "passed": success,
             "details": details,
-            "timestamp": datetime.now().isoformat()
+            "elapsed_s": round(time.monotonic() - self._started_monotonic, 3)
         }
         self.test_results.append(result)
         
@@ -36,227 +120,134 @@ class FractalBackendTester:
         if details:
             print(f"    {details}")
 
-    def test_health_check(self):
-        """Test basic API health"""
-        try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=10)
-            passed = response.status_code == 200
-            details = f"Status: {response.status_code}"
-            if passed and response.text:
-                details += f", Response: {response.text[:100]}"
-        except Exception as e:
-            passed = False
-            details = f"Error: {str(e)}"
-        
-        self.log_test("Health Check", passed, details)
-        return passed
+    def evaluate(self, response, validate):
+        """Shared status/JSON/exception handling for one API response.
 
-    def test_fractal_overlay_basic(self):
-        """Test fractal overlay endpoint with default parameters"""
+        `response` may be an exception (e.g. from gather); `validate(response, data)`
+        returns `(passed, details)` for a 200 response with a parsed JSON body.
+        """
         try:
-            url = f"{self.base_url}/api/fractal/v2.1/overlay"
-            response = requests.get(url, timeout=30)
-            
+            if isinstance(response, Exception):
+                raise response
             if response.status_code != 200:
-                passed = False
-                details = f"HTTP {response.status_code}: {response.text[:200]}"
-            else:
-                data = response.json()
-                # Check required fields
-                required_fields = ['symbol', 'currentWindow', 'matches']
-                missing_fields = [f for f in required_fields if f not in data]
-                
-                if missing_fields:
-                    passed = False
-                    details = f"Missing fields: {missing_fields}"
-                else:
-                    passed = True
-                    matches_count = len(data.get('matches', []))
-                    details = f"Symbol: {data.get('symbol')}, Matches: {matches_count}"
-                    
+                return False, f"HTTP {response.status_code}: {response.text[:200]}"
+            return validate(response, orjson.loads(response.content))
         except Exception as e:
-            passed = False
-            details = f"Error: {str(e)}"
-        
-        self.log_test("Fractal Overlay Basic", passed, details)
-        return passed
+            return False, f"Error: {str(e)}"
 
-    def test_fractal_overlay_horizon_30d(self):
-        """Test fractal overlay with 30D horizon"""
-        try:
-            url = f"{self.base_url}/api/fractal/v2.1/overlay?symbol=BTC&aftermathDays=30"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code != 200:
-                passed = False
-                details = f"HTTP {response.status_code}: {response.text[:200]}"
-            else:
-                data = response.json()
-                matches = data.get('matches', [])
-                if matches:
-                    first_match = matches[0]
-                    aftermath_len = len(first_match.get('aftermathNormalized', []))
-                    passed = aftermath_len >= 20
-                    details = f"Matches: {len(matches)}, Aftermath length: {aftermath_len}"
-                else:
-                    passed = False
-                    details = "No matches returned"
-                    
-        except Exception as e:
-            passed = False
-            details = f"Error: {str(e)}"
-        
-        self.log_test("Fractal Overlay 30D Horizon", passed, details)
-        return passed
+    @api_test("Health Check", HEALTH_PATH, timeout=10)
+    def test_health_check(self, response, data):
+        """Test basic API health"""
+        return True, f"Status: {response.status_code}, Response: {response.text[:100]}"
 
-    def test_fractal_overlay_horizon_180d(self):
-        """Test fractal overlay with 180D horizon"""
-        try:
-            url = f"{self.base_url}/api/fractal/v2.1/overlay?symbol=BTC&aftermathDays=180"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code != 200:
-                passed = False
-                details = f"HTTP {response.status_code}: {response.text[:200]}"
-            else:
-                data = response.json()
-                matches = data.get('matches', [])
-                if matches:
-                    first_match = matches[0]
-                    aftermath_len = len(first_match.get('aftermathNormalized', []))
-                    passed = aftermath_len >= 150
-                    details = f"Matches: {len(matches)}, Aftermath length: {aftermath_len}"
-                else:
-                    passed = False
-                    details = "No matches returned"
-                    
-        except Exception as e:
-            passed = False
-            details = f"Error: {str(e)}"
+    @api_test("Fractal Overlay Basic", OVERLAY_PATH)
+    def test_fractal_overlay_basic(self, response, data):
+        """Test fractal overlay endpoint with default parameters"""
+        # Check required fields
+        required_fields = ['symbol', 'currentWindow', 'matches']
+        missing_fields = [f for f in required_fields if f not in data]
         
-        self.log_test("Fractal Overlay 180D Horizon", passed, details)
-        return passed
+        if missing_fields:
+            return False, f"Missing fields: {missing_fields}"
+        matches_count = len(data.get('matches', []))
+        return True, f"Symbol: {data.get('symbol')}, Matches: {matches_count}"
 
-    def test_fractal_overlay_horizon_365d(self):
-        """Test fractal overlay with 365D horizon (CRITICAL)"""
-        try:
-            url = f"{self.base_url}/api/fractal/v2.1/overlay?symbol=BTC&aftermathDays=365"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code != 200:
-                passed = False
-                details = f"HTTP {response.status_code}: {response.text[:200]}"
-            else:
-                data = response.json()
+    async def test_fractal_overlay_horizons(self):
+        """Test fractal overlay across all horizons in one concurrent batch (365D is CRITICAL)"""
+        responses = await asyncio.gather(
+            *[
+                self.get(self.OVERLAY_PATH, params={'symbol': 'BTC', 'aftermathDays': days})
+                for days, _ in self.HORIZONS
+            ],
+            return_exceptions=True,
+        )
+        
+        def validate_horizon(min_len):
+            def validate(response, data):
                 matches = data.get('matches', [])
-                if matches:
-                    first_match = matches[0]
-                    aftermath_len = len(first_match.get('aftermathNormalized', []))
-                    passed = aftermath_len >= 300
-                    details = f"Matches: {len(matches)}, Aftermath length: {aftermath_len}"
-                    
-                    # Also check distribution series
-                    dist_series = data.get('distributionSeries')
-                    if dist_series:
-                        p10_len = len(dist_series.get('p10', []))
-                        details += f", Distribution series length: {p10_len}"
-                else:
-                    passed = False
-                    details = "No matches returned"
-                    
-        except Exception as e:
-            passed = False
-            details = f"Error: {str(e)}"
+                if not matches:
+                    return False, "No matches returned"
+                
+                aftermath_len = len(matches[0].get('aftermathNormalized', []))
+                details = f"Matches: {len(matches)}, Aftermath length: {aftermath_len}"
+                
+                # Also check distribution series
+                dist_series = data.get('distributionSeries')
+                if dist_series:
+                    details += f", Distribution series length: {len(dist_series.get('p10', []))}"
+                return aftermath_len >= min_len, details
+            return validate
         
-        self.log_test("Fractal Overlay 365D Horizon", passed, details)
-        return passed
-
-    def test_strategy_endpoint(self):
-        """Test strategy endpoint with different modes"""
-        modes = ['conservative', 'balanced', 'aggressive']
         all_passed = True
-        details_list = []
+        for (days, min_len), response in zip(self.HORIZONS, responses):
+            passed, details = self.evaluate(response, validate_horizon(min_len))
+            self.log_test(f"Fractal Overlay {days}D Horizon", passed, details)
+            all_passed = all_passed and passed
         
-        for mode in modes:
-            try:
-                url = f"{self.base_url}/api/fractal/v2.1/strategy?symbol=BTC&preset={mode}"
-                response = requests.get(url, timeout=30)
-                
-                if response.status_code != 200:
-                    all_passed = False
-                    details_list.append(f"{mode}: HTTP {response.status_code}")
-                else:
-                    data = response.json()
-                    # Check required fields
-                    required_fields = ['decision', 'edge', 'diagnostics', 'regime']
-                    missing_fields = [f for f in required_fields if f not in data]
-                    
-                    if missing_fields:
-                        all_passed = False
-                        details_list.append(f"{mode}: Missing fields {missing_fields}")
-                    else:
-                        details_list.append(f"{mode}: OK")
-                        
-            except Exception as e:
-                all_passed = False
-                details_list.append(f"{mode}: Error {str(e)}")
+        return all_passed
+
+    async def test_strategy_endpoint(self):
+        """Test strategy endpoint with different modes"""
+        def validate(response, data):
+            # Check required fields
+            required_fields = ['decision', 'edge', 'diagnostics', 'regime']
+            missing_fields = [f for f in required_fields if f not in data]
+            
+            if missing_fields:
+                return False, f"Missing fields {missing_fields}"
+            return True, "OK"
         
-        details = "; ".join(details_list)
+        # Submit every mode up front, then reap the responses in order
+        responses = await asyncio.gather(
+            *[
+                self.get(self.STRATEGY_PATH, params={'symbol': 'BTC', 'preset': mode})
+                for mode in self.STRATEGY_MODES
+            ],
+            return_exceptions=True,
+        )
+        outcomes = []
+        for mode, response in zip(self.STRATEGY_MODES, responses):
+            passed, details = self.evaluate(response, validate)
+            outcomes.append((passed, f"{mode}: {details}"))
+        all_passed = all(ok for ok, _ in outcomes)
+        details = "; ".join(detail for _, detail in outcomes)
         self.log_test("Strategy Endpoint (All Modes)", all_passed, details)
         return all_passed
 
-    def test_forward_equity_endpoint(self):
+    async def test_forward_equity_endpoint(self):
         """Test forward equity endpoint with different parameters"""
-        test_cases = [
-            {'preset': 'BALANCED', 'horizon': 7, 'role': 'ACTIVE'},
-            {'preset': 'CONSERVATIVE', 'horizon': 14, 'role': 'SHADOW'},
-            {'preset': 'AGGRESSIVE', 'horizon': 30, 'role': 'ACTIVE'}
-        ]
-        
-        all_passed = True
-        details_list = []
-        
-        for case in test_cases:
-            try:
-                params = f"symbol=BTC&preset={case['preset']}&horizon={case['horizon']}&role={case['role']}"
-                url = f"{self.base_url}/api/fractal/v2.1/admin/forward-equity?{params}"
-                response = requests.get(url, timeout=30)
-                
-                if response.status_code != 200:
-                    all_passed = False
-                    details_list.append(f"{case['preset']}-{case['horizon']}D: HTTP {response.status_code}")
-                else:
-                    data = response.json()
-                    if data.get('error'):
-                        all_passed = False
-                        details_list.append(f"{case['preset']}-{case['horizon']}D: API Error {data.get('error')}")
-                    else:
-                        # Check if we have equity data or empty result
-                        equity_len = len(data.get('equity', []))
-                        details_list.append(f"{case['preset']}-{case['horizon']}D: {equity_len} points")
-                        
-            except Exception as e:
-                all_passed = False
-                details_list.append(f"{case['preset']}-{case['horizon']}D: Error {str(e)}")
+        def validate(response, data):
+            if data.get('error'):
+                return False, f"API Error {data.get('error')}"
+            # Check if we have equity data or empty result
+            return True, f"{len(data.get('equity', []))} points"
         
-        details = "; ".join(details_list)
+        # Submit every case up front, then reap the responses in order
+        responses = await asyncio.gather(
+            *[
+                self.get(self.FORWARD_EQUITY_PATH, params=case)
+                for case in self.FORWARD_EQUITY_CASES
+            ],
+            return_exceptions=True,
+        )
+        outcomes = []
+        for case, response in zip(self.FORWARD_EQUITY_CASES, responses):
+            passed, details = self.evaluate(response, validate)
+            outcomes.append((passed, f"{case['preset']}-{case['horizon']}D: {details}"))
+        all_passed = all(ok for ok, _ in outcomes)
+        details = "; ".join(detail for _, detail in outcomes)
         self.log_test("Forward Equity Endpoint (All Params)", all_passed, details)
         return all_passed
 
-    def test_admin_endpoint(self):
+    async def test_admin_endpoint(self):
         """Test if admin endpoint is accessible"""
         try:
-            endpoints = [
-                f"{self.base_url}/admin/fractal",
-                f"{self.base_url}/api/admin/fractal"
-            ]
-            
             passed = False
             details = ""
             
-            for endpoint in endpoints:
+            for endpoint in self.ADMIN_PATHS:
                 try:
-                    response = requests.get(endpoint, timeout=10)
+                    response = await self.get(endpoint, timeout=10)
                     if response.status_code in [200, 401, 403]:
                         passed = True
                         details += f"{endpoint}: HTTP {response.status_code}; "
@@ -272,52 +263,63 @@ class FractalBackendTester:
             passed = False
             details = f"Error: {str(e)}"
         
-    def run_all_tests(self):
-        """Run all fractal backend tests"""
+    async def run_all_tests(self):
+        """Run all fractal backend tests concurrently (use inside `async with`)"""
         print("🚀 Starting Fractal Backend API Tests")
         print("=" * 60)
         print(f"Base URL: {self.base_url}")
         print()
         
-        # Test order - critical tests first
+        # Tests have no data dependencies, so fire them all at once
         test_methods = [
             self.test_health_check,
             self.test_strategy_endpoint,  # NEW - Critical for Strategy Controls
             self.test_forward_equity_endpoint,  # NEW - Critical for Forward Performance
             self.test_fractal_overlay_basic,
-            self.test_fractal_overlay_horizon_30d,
-            self.test_fractal_overlay_horizon_180d,
-            self.test_fractal_overlay_horizon_365d,  # Critical test
+            self.test_fractal_overlay_horizons,  # 365D is critical
             self.test_admin_endpoint
         ]
         
-        for test_method in test_methods:
-            try:
-                test_method()
-            except Exception as e:
-                self.log_test(test_method.__name__, False, f"Test execution error: {str(e)}")
-            
-            time.sleep(0.5)  # Brief pause between tests
+        outcomes = await asyncio.gather(
+            *[test_method() for test_method in test_methods],
+            return_exceptions=True,
+        )
+        
+        for test_method, outcome in zip(test_methods, outcomes):
+            if isinstance(outcome, Exception):
+                self.log_test(test_method.__name__, False, f"Test execution error: {str(outcome)}")
         
         print("\n" + "=" * 60)
         print(f"📊 Test Summary: {self.tests_passed}/{self.tests_run} tests passed")
         
-        if self.tests_passed < self.tests_run:
+        # Single pass: collect failures and flag critical ones together
+        failed = []
+        for result in self.test_results:
+            if not result['passed']:
+                failed.append(result)
+                if result['test_name'] in self.CRITICAL_TESTS:
+                    self.critical_failure = True
+        
+        if failed:
             print("\n❌ Failed Tests:")
-            for result in self.test_results:
-                if not result['passed']:
-                    print(f"   - {result['test_name']}: {result['details']}")
+            for result in failed:
+                print(f"   - {result['test_name']}: {result['details']}")
         
         return self.tests_passed, self.tests_run, self.test_results
 
+async def run_suite(tester):
+    """Run the suite on one event loop with the tester's client open"""
+    async with tester:
+        return await tester.run_all_tests()
+
 def main():
     """Main test execution"""
     tester = FractalBackendTester()
-    passed, total, results = tester.run_all_tests()
+    passed, total, results = asyncio.run(run_suite(tester))
     
     # Save detailed results
     test_results = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": tester.started_at.isoformat(),
         "summary": {
             "passed": passed,
             "total": total,
@@ -326,16 +328,13 @@ def main():
         "tests": results
     }
     
-    with open('/app/backend/backend_test_results.json', 'w') as f:
-        json.dump(test_results, f, indent=2)
+    with open('/app/backend/backend_test_results.json', 'wb') as f:
+        f.write(orjson.dumps(test_results, option=orjson.OPT_INDENT_2))
     
     print(f"\n📄 Detailed results saved to: /app/backend/backend_test_results.json")
     
     # Return exit code based on success
-    critical_tests = ['Strategy Endpoint (All Modes)', 'Forward Equity Endpoint (All Params)', 'Fractal Overlay Basic']
-    critical_failures = [r for r in results if r['test_name'] in critical_tests and not r['passed']]
-    
-    if critical_failures:
+    if tester.critical_failure:
         print(f"\n🚨 Critical test failures detected!")
         return 1
     
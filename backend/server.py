@@ -10,121 +10,295 @@ import subprocess
 import asyncio
 import signal
 import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 
-app = FastAPI(title="Fractal Proxy")
+app = FastAPI(title="Fractal Proxy", default_response_class=ORJSONResponse)
 
-# CORS
+# Shared upstream client, created on startup and reused for every proxied call
+app.state.client: httpx.AsyncClient | None = None
+
+# CORS - explicit methods/headers so preflights are answered from a fixed set
+# instead of echoing each request's Access-Control-Request-* back.
+# Credentials stay on: the frontend sends cookies (credentials: 'include').
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    allow_headers=["content-type", "authorization", "x-requested-with", "x-user-id"],
+    max_age=600,
 )
 
-# TypeScript backend port (internal)
+# TypeScript backend port (internal). The TS code calls itself on
+# localhost:8002 and backend_test.py targets it, so it must stay up.
 TS_PORT = 8002
-TS_BASE_URL = f"http://127.0.0.1:{TS_PORT}"
+# The proxy itself talks to the TS backend over a Unix socket (same container)
+TS_SOCKET_PATH = "/tmp/fractal.sock"
+TS_BASE_URL = "http://ts"
 
 ts_process = None
 
+# Deterministic GET endpoints whose responses are cached in-process.
+# Only touched from the event loop, so the TTLCache needs no lock.
+CACHEABLE_PATHS = frozenset({
+    "/api/fractal/v2.1/overlay",
+    "/api/fractal/v2.1/strategy",
+})
+response_cache = TTLCache(maxsize=512, ttl=60)
+
+# Requests carrying any of these may get a per-user response, so never share them
+_CREDENTIAL_HEADERS = ('authorization', 'cookie', 'x-user-id')
+# Upstream Cache-Control directives that forbid a shared cache
+_UNCACHEABLE_DIRECTIVES = ('no-store', 'private')
+
+def is_cacheable_response(upstream):
+    """Whether an upstream response may be stored in the shared cache"""
+    if upstream.status_code != 200 or 'set-cookie' in upstream.headers:
+        return False
+    cache_control = upstream.headers.get('cache-control', '')
+    return not any(d in cache_control for d in _UNCACHEABLE_DIRECTIVES)
+
+# Framing headers are recomputed when a cached body is replayed
+_UNCACHED_HEADERS = frozenset({b'content-length', b'transfer-encoding', b'connection'})
+
+def cached_response(content, raw_headers):
+    """Build a response from a cached (body, raw headers) entry"""
+    response = Response(content=content, status_code=200)
+    response.raw_headers.extend(raw_headers)
+    return response
+
 async def start_ts_backend():
     """Start TypeScript Fractal backend"""
     global ts_process
+    # A stale socket from a previous run would make listen() fail with EADDRINUSE
+    if os.path.exists(TS_SOCKET_PATH):
+        os.unlink(TS_SOCKET_PATH)
+    
     env = {
         **os.environ,
         'PORT': str(TS_PORT),
+        'SOCKET_PATH': TS_SOCKET_PATH,
         'FRACTAL_ONLY': '1',
         'MINIMAL_BOOT': '1',
         'FRACTAL_ENABLED': 'true'
     }
     
+    # stdout/stderr are inherited, so the kernel copies TS logs straight to
+    # the proxy's own fds without waking the event loop per line.
+    # A new session makes npx -> tsx -> node one process group we can signal.
     ts_process = await asyncio.create_subprocess_exec(
         'npx', 'tsx', 'src/app.fractal.ts',
         cwd='/app/backend',
         env=env,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+        stdout=None,
+        stderr=None,
+        start_new_session=True
     )
-    print(f"[Proxy] Started TypeScript backend on port {TS_PORT}, PID: {ts_process.pid}")
-    
-    # Log output in background
-    asyncio.create_task(log_output(ts_process.stdout, "[TS-OUT]"))
-    asyncio.create_task(log_output(ts_process.stderr, "[TS-ERR]"))
-
-async def log_output(stream, prefix):
-    """Log subprocess output"""
-    async for line in stream:
-        print(f"{prefix} {line.decode().rstrip()}")
+    print(f"[Proxy] Started TypeScript backend on port {TS_PORT} and {TS_SOCKET_PATH}, PID: {ts_process.pid}")
 
 @app.on_event("startup")
 async def startup():
     """Start TypeScript backend on app startup"""
     await start_ts_backend()
-    # Wait for TS backend to start
-    await asyncio.sleep(3)
+    app.state.client = httpx.AsyncClient(
+        # Pool limits live on the transport when one is passed explicitly.
+        # Idle sockets are kept for 60s, below Fastify's 75s keepAliveTimeout,
+        # so bursts of parallel requests reuse warm connections.
+        transport=httpx.AsyncHTTPTransport(
+            uds=TS_SOCKET_PATH,
+            limits=httpx.Limits(
+                max_keepalive_connections=64,
+                max_connections=128,
+                keepalive_expiry=60.0,
+            ),
+        ),
+        base_url=TS_BASE_URL,
+        timeout=60.0,
+    )
+    await wait_for_ts_backend()
+
+async def wait_for_ts_backend(budget=10.0, interval=0.1):
+    """Poll the TS backend health endpoint until it answers or `budget` seconds pass"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            response = await app.state.client.get("/api/health", timeout=min(0.2, remaining))
+            if response.status_code < 500:
+                print("[Proxy] TypeScript backend is ready")
+                return True
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(min(interval, max(deadline - loop.time(), 0)))
+    print(f"[Proxy] TypeScript backend not ready after {budget}s, serving anyway")
+    return False
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown"""
     global ts_process
+    if app.state.client:
+        await app.state.client.aclose()
+        app.state.client = None
     if ts_process:
-        ts_process.terminate()
-        await ts_process.wait()
+        await stop_ts_backend(ts_process)
+        ts_process = None
+
+def signal_process_group(process, sig):
+    """Signal the TS backend's whole process group.
+
+    start_new_session=True makes the group id equal to the leader's pid, so this
+    still reaches tsx/node after the npx leader has exited and been reaped.
+    """
+    try:
+        os.killpg(process.pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+
+async def stop_ts_backend(process, timeout=5.0):
+    """SIGTERM the TS process group, then SIGKILL whatever is left after `timeout` seconds"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    signal_process_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    
+    # The leader exiting says nothing about node further down the group;
+    # give the rest of the group until the deadline to finish shutting down
+    while loop.time() < deadline and signal_process_group(process, 0):
+        await asyncio.sleep(0.1)
+    
+    if signal_process_group(process, signal.SIGKILL):
+        print(f"[Proxy] TypeScript backend still running after {timeout}s SIGTERM, killed")
+    await process.wait()
 
 @app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy_api(request: Request, path: str):
     """Proxy all /api/* requests to TypeScript backend"""
-    url = f"{TS_BASE_URL}/api/{path}"
-    
-    # Get query params
-    query_params = str(request.query_params)
-    if query_params:
-        url = f"{url}?{query_params}"
+    url = f"/api/{path}"
     
-    # Get request body for non-GET methods
+    # Stream any request body through chunk by chunk instead of buffering it.
+    # Bodiless requests send none, so GETs don't go out as chunked uploads.
     body = None
-    if request.method in ["POST", "PUT", "PATCH"]:
-        body = await request.body()
+    if 'content-length' in request.headers or 'transfer-encoding' in request.headers:
+        body = request.stream()
     
-    # Forward headers
-    headers = dict(request.headers)
-    headers.pop('host', None)
+    # Forward raw header pairs (ASGI names are already lowercase bytes)
+    headers = [(k, v) for k, v in request.headers.raw if k != b'host']
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            response = await client.request(
-                method=request.method,
-                url=url,
-                content=body,
-                headers=headers
-            )
-            
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.headers.get('content-type')
-            )
-        except httpx.ConnectError:
-            return JSONResponse(
-                status_code=503,
-                content={"error": "TypeScript backend not ready", "url": url}
-            )
-        except Exception as e:
-            return JSONResponse(
-                status_code=500,
-                content={"error": str(e), "url": url}
-            )
+    # Serve repeat GETs of deterministic endpoints from the cache
+    cache_key = None
+    if (
+        request.method == "GET"
+        and url in CACHEABLE_PATHS
+        and 'no-store' not in request.headers.get('cache-control', '')
+        and not any(h in request.headers for h in _CREDENTIAL_HEADERS)
+    ):
+        # Raw bodies may be compressed, so the negotiated encoding is part of the key
+        cache_key = (url, str(request.query_params), request.headers.get('accept-encoding', ''))
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached_response(*cached)
+    
+    try:
+        upstream_request = app.state.client.build_request(
+            method=request.method,
+            url=url,
+            params=request.query_params.multi_items(),
+            content=body,
+            headers=headers
+        )
+        upstream = await app.state.client.send(upstream_request, stream=True)
+        
+        if cache_key is not None and is_cacheable_response(upstream):
+            try:
+                content = b"".join([chunk async for chunk in upstream.aiter_raw()])
+            finally:
+                await upstream.aclose()
+            raw_headers = [
+                (k.lower(), v) for k, v in upstream.headers.raw
+                if k.lower() not in _UNCACHED_HEADERS
+            ]
+            response_cache[cache_key] = (content, raw_headers)
+            return cached_response(content, raw_headers)
+        
+        # Pipe raw bytes through as they arrive; release the connection once sent
+        response = StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            background=BackgroundTask(upstream.aclose)
+        )
+        response.raw_headers = [(k.lower(), v) for k, v in upstream.headers.raw]
+        return response
+    except httpx.ConnectError:
+        return ORJSONResponse(
+            status_code=503,
+            content={"error": "TypeScript backend not ready", "url": url}
+        )
+    except Exception as e:
+        return ORJSONResponse(
+            status_code=500,
+            content={"error": str(e), "url": url}
+        )
+
+class FastHealthMiddleware:
+    """Answer GET/HEAD /health with a prebuilt response before routing, CORS or serialization.
+
+    Other methods fall through to the app, where the /health route returns 405.
+    """
+    
+    BODY = orjson.dumps({"ok": True, "proxy": True, "ts_port": TS_PORT, "ts_socket": TS_SOCKET_PATH})
+    START = {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(BODY)).encode()),
+        ],
+    }
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/health"
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            await send(self.START)
+            body = self.BODY if scope["method"] == "GET" else b""
+            await send({"type": "http.response.body", "body": body})
+            return
+        await self.app(scope, receive, send)
+
+# Added last so it is the outermost user middleware
+app.add_middleware(FastHealthMiddleware)
 
 @app.get("/health")
 async def health():
-    """Health check"""
-    return {"ok": True, "proxy": True, "ts_port": TS_PORT}
+    """Health check (GET/HEAD are served by FastHealthMiddleware; kept for routing/405)"""
+    return orjson.loads(FastHealthMiddleware.BODY)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8001,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
@@ -8,6 +8,7 @@
  */
 
 import 'dotenv/config';
+import http from 'node:http';
 import Fastify from 'fastify';
 import cors from '@fastify/cors';
 import { connectMongo, disconnectMongo } from './db/mongoose.js';
@@ -35,8 +36,11 @@ async function main() {
   console.log('  FRACTAL ONLY - Isolated Development Mode');
   console.log('═══════════════════════════════════════════════════════════════');
   
-  // Get port from env or default
+  // Get port from env or default; SOCKET_PATH adds a Unix socket listener
+  // next to the TCP port (internal self-calls still use localhost:PORT)
   const PORT = parseInt(process.env.PORT || '8001');
+  const SOCKET_PATH = process.env.SOCKET_PATH;
+  let socketServer: http.Server | null = null;
   
   // Connect to MongoDB
   console.log('[Fractal] Connecting to MongoDB...');
@@ -47,6 +51,9 @@ async function main() {
     logger: {
       level: process.env.LOG_LEVEL || 'info',
     },
+    // Keep above the Python proxy's pool keepalive_expiry (60s) so it never
+    // reuses a socket the server has already closed
+    keepAliveTimeout: 75_000,
   });
   
   // CORS
@@ -167,6 +174,9 @@ async function main() {
   // Graceful shutdown
   const shutdown = async (signal: string) => {
     console.log(`[Fractal] Received ${signal}, shutting down...`);
+    if (socketServer) {
+      await new Promise((resolve) => socketServer!.close(resolve));
+    }
     await app.close();
     await disconnectMongo();
     console.log('[Fractal] Shutdown complete');
@@ -179,8 +189,17 @@ async function main() {
   // Start server
   try {
     await app.listen({ port: PORT, host: '0.0.0.0' });
+    if (SOCKET_PATH) {
+      // Second listener sharing Fastify's router, for the same-container proxy
+      socketServer = http.createServer((req, res) => app.routing(req, res));
+      socketServer.keepAliveTimeout = 75_000;
+      await new Promise<void>((resolve, reject) => {
+        socketServer!.once('error', reject);
+        socketServer!.listen(SOCKET_PATH, () => resolve());
+      });
+    }
     console.log('═══════════════════════════════════════════════════════════════');
-    console.log(`  ✅ Fractal Backend started on port ${PORT}`);
+    console.log(`  ✅ Fractal Backend started on port ${PORT}${SOCKET_PATH ? ` and socket ${SOCKET_PATH}` : ''}`);
     console.log('═══════════════════════════════════════════════════════════════');
     console.log('');
     console.log('📦 Available Endpoints:');